@@ -1,25 +1,52 @@
+import heapq
 import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from PIL import Image, ImageDraw
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; without it the search runs as plain Python
+    njit = None
+
 class Cell:
-    NORTH = "North"
-    SOUTH = "South"
-    EAST = "East"
-    WEST = "West"
+    # Directions double as indexes into neighbor_cells
+    NORTH = 0
+    SOUTH = 1
+    EAST = 2
+    WEST = 3
+
+    # Bits of link_mask, one per direction that has a passage
+    NORTH_BIT = 1 << NORTH
+    SOUTH_BIT = 1 << SOUTH
+    EAST_BIT = 1 << EAST
+    WEST_BIT = 1 << WEST
+    DIRECTION_BITS = {(-1, 0): NORTH_BIT, (1, 0): SOUTH_BIT, (0, 1): EAST_BIT, (0, -1): WEST_BIT}
+    # The directions whose bits are set in each of the 16 possible link_masks
+    MASK_DIRECTIONS = tuple(tuple(d for d in range(4) if mask >> d & 1) for mask in range(16))
+
+    # Only meaningful while solving, so a cell doesn't carry its own copy
+    # until a solver assigns one
+    distance = 0
+
+    # The grid that froze this cell's links (see Grid.freeze), if any
+    grid = None
 
     def __init__(self, row:list, col:list) -> None: 
         self.row = row
         self.col = col
-        self.neighbor_cells = {} 
+        self.neighbor_cells = [None] * 4
         self.links = set()
-        self.content = " "  # Placeholder for any content you want to store in the cell
-        self.distance = 0  # Initialize distance as infinite for pathfinding algorithms
+        self.link_mask = 0  # Which directions have a passage, as *_BIT flags
 
     def link(self, cell, bidirectional=True) -> None:
         # Creates a passage between this cell and the provided cell. 
         # If bidirectional == True, create the same link (edge) between 
         # the other cell and this one. 
+        if type(self.links) is tuple:
+            self.thaw()
         self.links.add(cell)
+        self.link_mask |= self.direction_bit(cell)
         if bidirectional:
             cell.link(self, False)
 
@@ -27,51 +54,74 @@ class Cell:
         # Removes a passage (edge) between this cell and the provided one. 
         # If bidirectional == True, remove the edge from the other 
         # cell to this one.
+        if type(self.links) is tuple:
+            self.thaw()
         self.links.discard(cell)
+        self.link_mask &= ~self.direction_bit(cell)
         if bidirectional:
             cell.unlink(self, False)
 
+    def thaw(self) -> None:
+        # Turns frozen links back into a set before they're edited, and lets
+        # the grid that froze them know its maze is changing.
+        self.links = set(self.links)
+        if self.grid is not None:
+            self.grid.thaw()
+
     def is_linked(self, cell) -> bool:
         # Returns True if this cell is linked to the provided cell 
         # (there's an edge from this cell to the other one)
         return cell in self.links
+
+    def direction_bit(self, cell) -> int:
+        # Returns the *_BIT flag for the direction the provided cell lies in,
+        # or 0 if it isn't directly north/south/east/west of this one.
+        return Cell.DIRECTION_BITS.get((cell.row - self.row, cell.col - self.col), 0)
+
+    def is_linked_dir(self, direction_bit:int) -> bool:
+        # Returns True if there's a passage out of this cell in the direction
+        # given by direction_bit (one of the *_BIT flags)
+        return (self.link_mask & direction_bit) != 0
     
-    def get_neighbor(self, direction:str) -> None:
+    def get_neighbor(self, direction:int) -> None:
         # get neighbor - self explanatory
-        if direction not in [Cell.NORTH, Cell.SOUTH, Cell.EAST, Cell.WEST]:
-            raise NotImplementedError
-
-        # Return the neighbor if it exists, or None if it doesn't
-        return self.neighbor_cells.get(direction)
+        # Return the neighbor if it exists, or None if it doesn't. Anything
+        # that isn't one of the direction constants fails the index (or, for
+        # a negative number, the check in front of it), off the fast path.
+        try:
+            if direction >= 0:
+                return self.neighbor_cells[direction]
+        except (IndexError, TypeError):
+            pass
+        raise NotImplementedError
     
-    def set_neighbor(self, direction:str, cell) -> None:
+    def set_neighbor(self, direction:int, cell) -> None:
         # set direction to neighbor
-        if direction in [Cell.NORTH, Cell.SOUTH, Cell.EAST, Cell.WEST]:
-            self.neighbor_cells[direction] = cell
-        else:
-            raise NotImplementedError
+        try:
+            if direction >= 0:
+                self.neighbor_cells[direction] = cell
+                return
+        except (IndexError, TypeError):
+            pass
+        raise NotImplementedError
 
     def neighbors(self) -> list:
         # Returns a list of its neighbors: basically, the north, south, 
         # east, and west cells put into a list
-        return [neighbor for neighbor in self.neighbor_cells.values() if neighbor is not None]
+        return [neighbor for neighbor in self.neighbor_cells if neighbor is not None]
 
     def get_closest_cell(self) -> list:
         # Finds the linked neighbor that has the shortest distance assigned 
         # to it. If there are no linked neighbors, return None. 
         # A Linked Neighbor is a neighboring Cell (e.g North/South/East/West) 
         # that has an edge/link/passage.
-        all_neighbors = self.neighbors()
-        # Adding direct attribute checks
-        for direction in [Cell.NORTH, Cell.SOUTH, Cell.EAST, Cell.WEST]:
-            neighbor = getattr(self, direction.lower(), None)
-            if neighbor and self.is_linked(neighbor):
-                all_neighbors.append(neighbor)
-
-        if not all_neighbors:
-            return None
-
-        return min(all_neighbors, key=lambda n: n.distance)
+        # Plain loop rather than min(key=lambda ...) to skip a Python call
+        # per neighbor
+        closest = None
+        for neighbor in self.links:
+            if closest is None or neighbor.distance < closest.distance:
+                closest = neighbor
+        return closest
 
     def print(self) -> str:
         return f"Cell({self.row}, {self.col})"
@@ -81,30 +131,42 @@ class Grid:
     def __init__(self, num_rows:int, num_cols:int) -> None:
         self.num_rows = num_rows
         self.num_cols = num_cols
+        self.cells = []
         self.rows = []
+        self.frozen = False  # True from freeze() until a cell is edited again
+        self.perfect = False  # Frozen as a perfect maze (see freeze())
+        self.adjacency_cache = None  # (offsets, neighbors) while frozen
+        self.walls_cache = None  # (east, south) wall arrays while frozen
         self.prepare_grid()
         self.configure_cells()
 
     def __iter__(self) -> None:
-        for row in self.rows:
-            for cell in row:
-                yield cell
+        yield from self.cells
 
     def prepare_grid(self) -> None:
-        # Create all the rows, populating them by creating cells
-        self.rows = [[Cell(row, col) for col in range(self.num_cols)] for row in range(self.num_rows)]
+        # Create all the cells in one flat, row-major list (cell id
+        # row * num_cols + col), then slice it up into the rows
+        self.cells = [Cell(row, col) for row in range(self.num_rows) for col in range(self.num_cols)]
+        self.rows = [self.cells[row * self.num_cols:(row + 1) * self.num_cols] for row in range(self.num_rows)]
 
     def configure_cells(self) -> None:
         # Iterate through all the cells, telling each cell what it's neighbors 
         # are (e.g. what Cell.north, etc are).
         #
         # Hint: The north neighbor of cell is the one at row cell.row - 1 and column cell.col
-        for cell in self.all_cells():
-            row, col = cell.row, cell.col
-            cell.set_neighbor(Cell.NORTH, self.get_cell(row - 1, col))
-            cell.set_neighbor(Cell.SOUTH, self.get_cell(row + 1, col))
-            cell.set_neighbor(Cell.EAST, self.get_cell(row, col + 1))
-            cell.set_neighbor(Cell.WEST, self.get_cell(row, col - 1))
+        #
+        # Each pair of neighbors is visited once, pairing rows/columns up
+        # with zip so there's no bounds checking: a cell's south/east
+        # neighbor points back north/west at it. Cells along the edges just
+        # keep the None they were created with.
+        for upper_row, lower_row in zip(self.rows, self.rows[1:]):
+            for cell, south_cell in zip(upper_row, lower_row):
+                cell.neighbor_cells[Cell.SOUTH] = south_cell
+                south_cell.neighbor_cells[Cell.NORTH] = cell
+        for row in self.rows:
+            for cell, east_cell in zip(row, row[1:]):
+                cell.neighbor_cells[Cell.EAST] = east_cell
+                east_cell.neighbor_cells[Cell.WEST] = cell
 
     def get_cell(self, row, col) -> Cell:
         # Return the cell at the specified row and column.
@@ -112,98 +174,278 @@ class Grid:
             return self.rows[row][col]
         return None
 
+    def cell_id(self, row:int, col:int) -> int:
+        # Index of the cell at row/col in the flat cell list.
+        return row * self.num_cols + col
+
     def all_cells(self) -> list:
-        # Return a flattened list of all the cells in the grid.
-        return [cell for row in self.rows for cell in row]
+        # Return a flattened list of all the cells in the grid. It's a copy:
+        # self.cells itself is indexed by cell id and must stay in order.
+        return list(self.cells)
+
+    def link_masks(self):
+        # Returns every cell's link_mask as a num_rows x num_cols array.
+        masks = np.fromiter((cell.link_mask for cell in self.cells), dtype=np.uint8, count=len(self.cells))
+        return masks.reshape(self.num_rows, self.num_cols)
+
+    def walls(self) -> tuple:
+        # Returns (east, south): num_rows x num_cols boolean arrays that are
+        # True where a cell has a wall on that side, including along the
+        # edges of the grid. The arrays are read-only: once the grid is
+        # frozen the same ones are shared by print and export_image until
+        # one of its cells is linked or unlinked again.
+        if self.walls_cache is not None:
+            return self.walls_cache
+        masks = self.link_masks()
+        east = (masks & Cell.EAST_BIT) == 0
+        south = (masks & Cell.SOUTH_BIT) == 0
+        east.setflags(write=False)
+        south.setflags(write=False)
+        if self.frozen:
+            self.walls_cache = (east, south)
+        return east, south
+
+    def adjacency(self) -> tuple:
+        # Flattens the maze's links into CSR form. The cell with id i is
+        # linked to neighbors[offsets[i]:offsets[i + 1]]. Once the grid is
+        # frozen the same lists are handed out on every call, so they must
+        # not be modified.
+        if self.adjacency_cache is not None:
+            return self.adjacency_cache
+        offsets = [0]
+        neighbors = []
+        for cell in self.cells:
+            neighbors.extend(self.cell_id(neighbor.row, neighbor.col) for neighbor in cell.links)
+            offsets.append(len(neighbors))
+        if self.frozen:
+            self.adjacency_cache = (offsets, neighbors)
+        return offsets, neighbors
     
-    def export_image(self, filename:str='maze.png', path:str=None) -> None:
-        # Export image to png format
+    def freeze(self, perfect:bool=False) -> None:
+        # Called once a maze is finished: swaps each cell's set of links for
+        # a tuple. With at most four links, scanning a tuple is as quick as
+        # hashing into a set and takes a fraction of the memory. Linking or
+        # unlinking a cell afterwards turns its links back into a set.
+        #
+        # While frozen the grid can also keep hold of things worked out from
+        # its links (e.g. adjacency()); thaw() drops them again. perfect says
+        # the maze has exactly one path between any two cells, as every
+        # maze maker here produces, which solve_maze can take advantage of.
+        for cell in self.cells:
+            cell.links = tuple(cell.links)
+            cell.grid = self
+        self.thaw()
+        self.frozen = True
+        self.perfect = perfect
+
+    def thaw(self) -> None:
+        # Called when a frozen cell gets edited: the maze is changing, so
+        # anything cached from its links is out of date.
+        self.frozen = False
+        self.perfect = False
+        self.adjacency_cache = None
+        self.walls_cache = None
+
+    def link_from_masks(self, masks:list, perfect:bool=False) -> None:
+        # Sets up the passages described by a list of link masks, one per
+        # cell id (e.g. from make_maze_masks() or another grid's
+        # link_masks()), replacing any the grid already had, and freezes the
+        # grid. The links are written straight onto the cells rather than
+        # going through Cell.link, so the masks have to describe both ends
+        # of every passage, as a finished maze's do. Pass perfect=True when
+        # the masks come from a perfect maze, as freeze() does.
+        mask_directions = Cell.MASK_DIRECTIONS
+        for cell, mask in zip(self.cells, masks):
+            neighbor_cells = cell.neighbor_cells
+            cell.links = tuple([neighbor_cells[direction] for direction in mask_directions[mask]])
+            cell.link_mask = mask
+        self.freeze(perfect=perfect)
+
+    @classmethod
+    def generate_batch(cls, num_rows:int, num_cols:int, count:int, maker_cls, workers:int=None, seed:int=None,
+                       as_grids:bool=True) -> list:
+        # Makes count independent mazes with maker_cls, spread over a pool of
+        # worker processes. Maze i is always made from seed + i, so a given
+        # seed produces the same mazes however many workers there are.
+        #
+        # Turning the results back into Grids happens here, one maze at a
+        # time, and creating a Grid's Cells costs about half as much as
+        # making the maze did. With as_grids=False the link masks come back
+        # as they are (one list per maze, in cell id order) and callers can
+        # build Grids from them with link_from_masks only when they need to.
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        jobs = [(num_rows, num_cols, maker_cls, seed + i) for i in range(count)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            all_masks = list(pool.map(cls.make_maze_masks, jobs))
+
+        # Workers only send back each maze's link masks; pickling the Cells
+        # themselves would mean walking the whole web of neighbor references.
+        if not as_grids:
+            return all_masks
+        grids = []
+        for masks in all_masks:
+            grid = cls(num_rows, num_cols)
+            # Every maker here builds perfect mazes.
+            grid.link_from_masks(masks, perfect=True)
+            grids.append(grid)
+        return grids
+
+    @staticmethod
+    def make_maze_masks(job:tuple) -> list:
+        # Worker for generate_batch: makes one seeded maze and returns its
+        # link masks in cell id order. It reseeds the process-wide random and
+        # np.random generators, so calling it outside a worker clobbers
+        # their state.
+        num_rows, num_cols, maker_cls, seed = job
+        random.seed(seed)
+        np.random.seed(seed % 2 ** 32)
+        grid = Grid(num_rows, num_cols)
+        maker_cls(grid).make_maze()
+        return [cell.link_mask for cell in grid.cells]
+
+    def export_image(self, filename:str='maze.png', path:list=None) -> Image.Image:
+        # Export image to png format. The image is returned as well, so a
+        # solution can be drawn over it without reading the file back in.
         cell_size = 20  # Size of each cell in the image (pixels)
         img_width = self.num_cols * cell_size
         img_height = self.num_rows * cell_size
 
-        img = Image.new('RGB', (img_width, img_height), 'white')
-        draw = ImageDraw.Draw(img)
-
-        # Draw the maze
-        for cell in self.all_cells():
-            x1 = cell.col * cell_size
-            y1 = cell.row * cell_size
-            x2 = (cell.col + 1) * cell_size
-            y2 = (cell.row + 1) * cell_size
-
-            # Draw the cell walls
-            if not cell.is_linked(cell.get_neighbor('North')):
-                draw.line([(x1, y1), (x2, y1)], fill='black')
-            if not cell.is_linked(cell.get_neighbor('South')):
-                draw.line([(x1, y2), (x2, y2)], fill='black')
-            if not cell.is_linked(cell.get_neighbor('East')):
-                draw.line([(x2, y1), (x2, y2)], fill='black')
-            if not cell.is_linked(cell.get_neighbor('West')):
-                draw.line([(x1, y1), (x1, y2)], fill='black')
+        # Work out every wall first. horizontal[r][c] is the wall along the top
+        # edge of row r (row num_rows being the bottom edge of the maze) and
+        # vertical[r][c] is the wall along the left edge of column c.
+        # Links always go both ways, so a cell's north/west walls are just
+        # the south/east walls of the cells above/left of it.
+        east, south = self.walls()
+        horizontal = np.ones((self.num_rows + 1, self.num_cols), dtype=bool)
+        vertical = np.ones((self.num_rows, self.num_cols + 1), dtype=bool)
+        horizontal[1:] = south
+        vertical[:, 1:] = east
+
+        # Draw the maze: black out all the wall pixels in one go per direction.
+        # The extra row/column holds the bottom and right walls, which fall
+        # just outside the image and get cropped off.
+        pixels = np.full((img_height + 1, img_width + 1), 255, dtype=np.uint8)
+        pixels[::cell_size][self.wall_pixels(horizontal, cell_size)] = 0
+        pixels[:, ::cell_size][self.wall_pixels(vertical.T, cell_size).T] = 0
+
+        # The walls are black and white, so the image stays at one byte per
+        # pixel unless there's a red solution path to draw on it
+        img = Image.fromarray(pixels[:img_height, :img_width])
 
         # Draw the solution path if provided
         if path:
-            for i in range(len(path) - 1):
-                cell1 = path[i]
-                cell2 = path[i + 1]
-                mid1 = ((cell1.col + 0.5) * cell_size, (cell1.row + 0.5) * cell_size)
-                mid2 = ((cell2.col + 0.5) * cell_size, (cell2.row + 0.5) * cell_size)
-                draw.line([mid1, mid2], fill='red', width=3)
+            img = img.convert('RGB')
+            self.draw_path(img, path, cell_size, width=3)
 
         img.save(filename)
-
-    def draw_export_image(self, image_path:str, path:str=None, filename:str='solved_maze.png') -> None:
-        # Draw path through generated maze
-        cell_size = 20
-        image = Image.open(image_path)
-        draw = ImageDraw.Draw(image)
-
+        return img
+
+    def wall_pixels(self, walls, cell_size:int):
+        # Stretches a grid of wall segments into a mask of pixels along its
+        # second axis. Each segment covers cell_size + 1 pixels, sharing its
+        # end points with the segments on either side.
+        mask = np.zeros((walls.shape[0], walls.shape[1] * cell_size + 1), dtype=bool)
+        mask[:, :-1] = np.repeat(walls, cell_size, axis=1)
+        mask[:, cell_size::cell_size] |= walls
+        return mask
+
+    def draw_path(self, image:Image.Image, path:list, cell_size:int, width:int) -> None:
+        # Draws the path as one red polyline through the middle of its cells
         offset = cell_size // 2
+        points = [(cell.col * cell_size + offset, cell.row * cell_size + offset) for cell in path]
+        ImageDraw.Draw(image).line(points, fill='red', width=width)
 
-        for i in range(len(path) - 1):
-            cell1 = path[i]
-            cell2 = path[i + 1]
-            x1, y1 = cell1.col * cell_size + offset, cell1.row * cell_size + offset
-            x2, y2 = cell2.col * cell_size + offset, cell2.row * cell_size + offset
-            draw.line([(x1, y1), (x2, y2)], fill='red', width=2)
+    def draw_export_image(self, image:Image.Image, path:list=None, filename:str='solved_maze.png') -> Image.Image:
+        # Draw path through a maze image returned by export_image, leaving
+        # that image untouched, and save the result
+        cell_size = 20
+        solved = image.convert('RGB')  # Always a copy
+        if path:
+            self.draw_path(solved, path, cell_size, width=2)
 
-        image.save(filename)
-        # image.show()
+        solved.save(filename)
+        return solved
     
     def print(self) -> None:
-        # Prints out the grid.
-        output = "+---" * self.num_cols + "+\n"
-        for row in self.rows:
-            top = "|"
-            bottom = "+"
-            for cell in row:
-                body = "   "  # three spaces for the cell body
-                east_boundary = " " if cell.is_linked(cell.get_neighbor(Cell.EAST)) else "|"
-                south_boundary = "   " if cell.is_linked(cell.get_neighbor(Cell.SOUTH)) else "---"
-                top += body + east_boundary
-                bottom += south_boundary + "+"
-            output += top + "\n" + bottom + "\n"
+        # Prints out the grid. Lines are collected in a list and joined once
+        # at the end rather than growing one string cell by cell.
+        east, south = self.walls()
+        lines = ["+---" * self.num_cols + "+"]
+        for east_row, south_row in zip(east.tolist(), south.tolist()):
+            # Each cell is three spaces of body plus its east wall, and its
+            # south wall plus a corner
+            lines.append("|" + "".join("   |" if wall else "    " for wall in east_row))
+            lines.append("+" + "".join("---+" if wall else "   +" for wall in south_row))
+        output = "\n".join(lines) + "\n"
         print(output)
         return output
     
     def solve_maze(self, start_cell, end_cell):
-        stack = [(start_cell, [start_cell])]
-        visited = set()
+        # Finds a shortest path from start_cell to end_cell, or None if there
+        # isn't one. Each cell only remembers where it was reached from; the
+        # path is rebuilt once by walking those parents backwards.
+        #
+        # In a perfect maze (frozen by one of the maze makers) there's only
+        # one path, so a plain depth-first search finds it. Anything else may
+        # have loops and gets an A* search instead: a heap push and pop for
+        # every cell makes it several times slower, but it always returns a
+        # shortest path.
+        if self.perfect:
+            parent = self.depth_first_parents(start_cell, end_cell)
+        else:
+            parent = self.a_star_parents(start_cell, end_cell)
+        if end_cell not in parent:
+            return None
 
+        path = []
+        current_cell = end_cell
+        while current_cell is not None:
+            path.append(current_cell)
+            current_cell = parent[current_cell]
+        path.reverse()
+        return path
+
+    def depth_first_parents(self, start_cell, end_cell) -> dict:
+        # Searches depth first from start_cell until end_cell turns up,
+        # recording the cell each one was reached from.
+        stack = [start_cell]
+        parent = {start_cell: None}
         while stack:
-            current_cell, path = stack.pop()
+            current_cell = stack.pop()
             if current_cell == end_cell:
-                return path
-
-            visited.add(current_cell)
+                break
+            for neighbor in current_cell.links:
+                if neighbor not in parent:
+                    parent[neighbor] = current_cell
+                    stack.append(neighbor)
+        return parent
+
+    def a_star_parents(self, start_cell, end_cell) -> dict:
+        # A* search: cells come off the heap ordered by distance so far plus
+        # the Manhattan distance left to end_cell. That never overestimates
+        # on the grid, so once end_cell comes off, its recorded parents lead
+        # back along a shortest path.
+        end_row, end_col = end_cell.row, end_cell.col
+        queue = [(0, 0, id(start_cell), start_cell)]
+        parent = {start_cell: None}
+        distance = {start_cell: 0}
+
+        while queue:
+            _, dist, _, current_cell = heapq.heappop(queue)
+            if dist != distance[current_cell]:
+                continue  # Stale entry left behind by a shorter route
+            if current_cell == end_cell:
+                break
 
+            new_distance = dist + 1
             for neighbor in current_cell.links:
-                if neighbor not in visited:
-                    new_path = list(path)
-                    new_path.append(neighbor)
-                    stack.append((neighbor, new_path))
-        return None
+                if neighbor not in distance or new_distance < distance[neighbor]:
+                    distance[neighbor] = new_distance
+                    parent[neighbor] = current_cell
+                    estimate = new_distance + abs(neighbor.row - end_row) + abs(neighbor.col - end_col)
+                    heapq.heappush(queue, (estimate, new_distance, id(neighbor), neighbor))
+        return parent
     
 # This is a simple maze maker algorithm that uses a "binary tree" approach 
 # to making a simple maze: It starts in the upper-left corner of the grid, 
@@ -216,19 +458,20 @@ class BinaryTreeMazeMaker:
         self.grid = grid
 
     def make_maze(self) -> None:
-        for cell in self.grid.all_cells():
-            neighbors = []
+        # All the coin flips are drawn in one go up front: 0 breaks the
+        # south wall, 1 the east wall
+        cells = self.grid.cells
+        coins = np.random.randint(0, 2, size=len(cells)).tolist()
+        for cell, coin in zip(cells, coins):
             south_neighbor = cell.get_neighbor(Cell.SOUTH)
             east_neighbor = cell.get_neighbor(Cell.EAST)
 
-            if south_neighbor:
-                neighbors.append(south_neighbor)
-            if east_neighbor:
-                neighbors.append(east_neighbor)
+            if south_neighbor and east_neighbor:
+                cell.link(east_neighbor if coin else south_neighbor)
+            elif south_neighbor or east_neighbor:
+                cell.link(south_neighbor or east_neighbor)
 
-            if neighbors:
-                chosen = random.choice(neighbors)
-                cell.link(chosen)
+        self.grid.freeze(perfect=True)
 
 # Starting in the northwest corner
 # "Flip a coin": Get a random number between 0 and 1
@@ -248,33 +491,64 @@ class SidewinderMazeMaker:
         self.grid = grid
 
     def make_maze(self) -> None:
-        for row in self.grid.rows:
-            run = []
-            for cell in row:
-                run.append(cell)
-                at_eastern_boundary = (cell.get_neighbor(Cell.EAST) is None)
-                at_northern_boundary = (cell.get_neighbor(Cell.NORTH) is None)
-
-                # Flip a coin
-                should_close_out = at_eastern_boundary or (not at_northern_boundary and random.randint(0, 1) == 0)
-
-                if should_close_out:
-                    member = random.choice(run)
-                    if member.get_neighbor(Cell.NORTH):
-                        member.link(member.get_neighbor(Cell.NORTH))
-                    run = []
-                else:
-                    cell.link(cell.get_neighbor(Cell.EAST))
-
-# Initialize source:
-# Set the distance attribute of all nodes (cells) in the graph (grid)
-#  to float('inf') or 10000
-# Set the distance for the source node (the north-west cell) to be 0
-# Put all the nodes in the graph into a queue
-# While there are more nodes in the queue:
-# Get the node from the queue with the smallest distance assigned
-# Add it to the set of nodes that we know the distance to
-# For all the linked neighbors of the node, relax the weights
+        # Draw every cell's coin flip, and a number in [0, 1) for picking a
+        # member of the run, in one go up front
+        num_cells = self.grid.num_rows * self.grid.num_cols
+        coins = np.random.randint(0, 2, size=num_cells).tolist()
+        picks = np.random.random(num_cells).tolist()
+        # Cells go row by row in cell id order; the run is always closed out
+        # at the eastern boundary, so it starts empty on every row
+        run = []
+        for cell_id, cell in enumerate(self.grid.cells):
+            run.append(cell)
+            at_eastern_boundary = (cell.get_neighbor(Cell.EAST) is None)
+            at_northern_boundary = (cell.get_neighbor(Cell.NORTH) is None)
+
+            # Flip a coin
+            should_close_out = at_eastern_boundary or (not at_northern_boundary and coins[cell_id] == 0)
+
+            if should_close_out:
+                member = run[int(picks[cell_id] * len(run))]
+                if member.get_neighbor(Cell.NORTH):
+                    member.link(member.get_neighbor(Cell.NORTH))
+                run = []
+            else:
+                cell.link(cell.get_neighbor(Cell.EAST))
+
+        self.grid.freeze(perfect=True)
+
+def a_star_distances(offsets, neighbors, distances, source:int, target:int, num_cols:int):
+    # A* over a CSR adjacency (see Grid.adjacency). distances comes in
+    # filled with 10000 and is filled in from source outwards. Every link
+    # has a weight of 1, and cells come off the queue ordered by distance so
+    # far plus the Manhattan distance left to the target. That never
+    # overestimates on the grid, so the search stops as soon as the target
+    # comes off; cells along the way keep exact distances, which is all
+    # recover_path needs. Only ints and flat sequences are touched, so with
+    # numba installed there's also a compiled copy (see below).
+    target_row = target // num_cols
+    target_col = target % num_cols
+    distances[source] = 0
+    queue = [(0, 0, source)]
+    while queue:
+        _, dist, cell_id = heapq.heappop(queue)
+        if dist != distances[cell_id]:
+            continue  # Stale entry left behind by an earlier relaxation
+        if cell_id == target:
+            break
+        new_distance = dist + 1
+        for i in range(offsets[cell_id], offsets[cell_id + 1]):
+            neighbor = neighbors[i]
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                estimate = new_distance + abs(neighbor // num_cols - target_row) + abs(neighbor % num_cols - target_col)
+                heapq.heappush(queue, (estimate, new_distance, neighbor))
+    return distances
+
+compiled_a_star_distances = njit(cache=True)(a_star_distances) if njit is not None else None
+
+# DjikstraSolver.solve works out the distances from the north-west cell in
+# one go, over the grid's flattened links (a_star_distances), then:
 # Recover the path from the grid:
 # Start with the target cell (the cell at the south-east corner of the maze)
 # Put it in the path
@@ -283,7 +557,19 @@ class SidewinderMazeMaker:
 # Put it in the path
 # Reverse the path list
 # Return the path
+#
+# initialize, relax and add_to_queue are the original per-Cell steps of
+# the search (set every distance on the grid to 10000 and the source's to
+# 0; relax a cell's links, pushing improved neighbors onto self.queue).
+# solve doesn't use them and nothing pops self.queue any more; they're
+# kept as the per-Cell API the test_initialize and test_relax tests cover.
 class DjikstraSolver:
+    # Smallest maze (in cells) worth handing to compiled_a_star_distances.
+    # The first compiled call in a process costs about 0.2 s to load from
+    # numba's disk cache, or over a second to compile from cold, while plain
+    # Python gets through a maze this size in a few tens of milliseconds.
+    COMPILED_MIN_CELLS = 40000
+
     def __init__(self, grid: Grid) -> None:
         self.grid = grid
         self.queue = []
@@ -293,7 +579,7 @@ class DjikstraSolver:
 
         # NOTE: Originally had 'inf' but based on piazza messages, I switched
         # it to 10000 based on the discussions (cell.distance)
-        for cell in self.grid.all_cells():
+        for cell in self.grid.cells:
             cell.distance = 10000
         self.grid.get_cell(0, 0).distance = 0
 
@@ -311,18 +597,35 @@ class DjikstraSolver:
                 self.add_to_queue(neighbor, new_distance)
 
     def add_to_queue(self, cell:Cell, distance:int) -> None:
-        # Sort the queue by distance
-        self.queue.append((distance, cell))
-        self.queue.sort(key=lambda x: x[0]) 
+        # Push onto the binary heap, keyed by distance. id(cell) breaks ties
+        # so two Cells never get compared directly.
+        heapq.heappush(self.queue, (distance, id(cell), cell))
+
+    def shortest_distances(self, offsets:list, neighbors:list, source:int, target:int) -> list:
+        # Runs a_star_distances over the CSR adjacency and returns the
+        # distance of every cell. Big mazes use the compiled version, if
+        # numba is installed, which wants arrays; plain Python is quicker on
+        # lists, and on small mazes it's quicker overall (see
+        # COMPILED_MIN_CELLS).
+        num_cells = len(offsets) - 1
+        if compiled_a_star_distances is None or num_cells < DjikstraSolver.COMPILED_MIN_CELLS:
+            return a_star_distances(offsets, neighbors, [10000] * num_cells, source, target, self.grid.num_cols)
+        distances = compiled_a_star_distances(np.array(offsets, dtype=np.int64), np.array(neighbors, dtype=np.int64),
+                                              np.full(num_cells, 10000, dtype=np.int64), source, target, self.grid.num_cols)
+        return distances.tolist()
 
     def solve(self) -> list:
-        # Solves the maze using Dijkstra's algorithm.
-        self.initialize()
-        self.add_to_queue(self.grid.get_cell(0, 0), 0)
-
-        while self.queue:
-            _, curr_cell = self.queue.pop(0)  # Retrieve and remove the cell with the lowest distance
-            self.relax(curr_cell)
+        # Solves the maze using Dijkstra's algorithm, steered towards the
+        # target with the A* heuristic. The search itself runs on the
+        # flattened adjacency (kept by the grid while it's frozen); the
+        # distances are copied back onto the cells afterwards so
+        # recover_path can walk them.
+        offsets, neighbors = self.grid.adjacency()
+        source = self.grid.cell_id(0, 0)
+        target = self.grid.cell_id(self.grid.num_rows - 1, self.grid.num_cols - 1)
+        distances = self.shortest_distances(offsets, neighbors, source, target)
+        for cell, distance in zip(self.grid.cells, distances):
+            cell.distance = distance
 
         target = self.grid.get_cell(self.grid.num_rows - 1, self.grid.num_cols - 1)
         if target.distance == 10000:
@@ -332,16 +635,23 @@ class DjikstraSolver:
 
     def recover_path(self) -> list:
         # Recovers the path from the target cell back to the source cell.
+        # Each step is a single pass over the links for the one with the
+        # smallest distance below the current cell's; no temporary lists or
+        # key functions.
         path = []
+        source = self.grid.get_cell(0, 0)
         current = self.grid.get_cell(self.grid.num_rows - 1, self.grid.num_cols - 1)
         while current:
             path.append(current)
-            if current.row == 0 and current.col == 0:
+            if current is source:
                 break
-            neighbors = [neighbor for neighbor in current.links if neighbor.distance < current.distance]
-            if not neighbors:
-                break
-            current = min(neighbors, key=lambda n: n.distance)
+            closest = None
+            closest_distance = current.distance
+            for neighbor in current.links:
+                if neighbor.distance < closest_distance:
+                    closest = neighbor
+                    closest_distance = neighbor.distance
+            current = closest
         path.reverse()
         return path
     
@@ -355,57 +665,66 @@ class DjikstraSolver:
 class EllerMazeMaker:
     def __init__(self, grid:Grid) -> None:
         self.grid = grid
+        # Union-find over cell ids: parent[i] leads towards the id that
+        # represents cell i's set, rank bounds the height of each tree.
+        self.parent = []
+        self.rank = []
 
     def make_maze(self) -> None:
-        set_counter = 0
-        sets = {}
+        # Every cell starts off in a set of its own.
+        self.parent = list(range(self.grid.num_rows * self.grid.num_cols))
+        self.rank = [0] * len(self.parent)
 
         # NOTE: While im not a fan of nested loops and statements, like this,
         # it was sadly the best way I could incorporate. Specific feedback here
         # on how I could make this look better is greatly appreciated if you 
         # you have the time :)
         for y, row in enumerate(self.grid.rows):
-            for cell in row:
-                if cell not in sets:
-                    set_counter += 1
-                    sets[cell] = set_counter
-
+            last_row = (y == self.grid.num_rows - 1)
             for i in range(len(row) - 1):
                 cell = row[i]
                 next_cell = row[i + 1]
-                if sets[cell] != sets[next_cell] and random.choice([True, False]):
+                # On the final row, link all adjacent cells in different sets
+                if self.find(cell) != self.find(next_cell) and (last_row or random.choice([True, False])):
                     cell.link(next_cell)
-                    self.merge_sets(sets, cell, next_cell)
+                    self.merge_sets(cell, next_cell)
 
-            set_groups = self.group_sets_by_id(sets, row)
-            for group in set_groups.values():
-                if y < self.grid.num_rows - 1:  # Skip for last row
-                    cell_to_link = random.choice(list(group))
+            if not last_row:
+                for group in self.group_sets_by_id(row).values():
+                    cell_to_link = random.choice(group)
                     south_cell = self.grid.get_cell(cell_to_link.row + 1, cell_to_link.col)
                     cell_to_link.link(south_cell)
-                    sets[south_cell] = sets[cell_to_link]
-
-            if y == self.grid.num_rows - 1:
-                for i in range(len(row) - 1):
-                    cell = row[i]
-                    next_cell = row[i + 1]
-                    if sets[cell] != sets[next_cell]:
-                        cell.link(next_cell)
-
-    def merge_sets(self, sets, cell:Cell, other_cell:Cell) -> None:
-        # Merge sets when a horizontal connection is made.
-        target_set_id = sets[other_cell]
-        source_set_id = sets[cell]
-        for c in sets:
-            if sets[c] == source_set_id:
-                sets[c] = target_set_id
-
-    def group_sets_by_id(self, sets:dict, row:dict) -> list:
+                    self.merge_sets(cell_to_link, south_cell)
+
+        self.grid.freeze(perfect=True)
+
+    def find(self, cell:Cell) -> int:
+        # Returns the id representing the set the cell belongs to, pointing
+        # every id visited along the way straight at it (path compression).
+        root = self.grid.cell_id(cell.row, cell.col)
+        while self.parent[root] != root:
+            root = self.parent[root]
+        cell_id = self.grid.cell_id(cell.row, cell.col)
+        while self.parent[cell_id] != root:
+            self.parent[cell_id], cell_id = root, self.parent[cell_id]
+        return root
+
+    def merge_sets(self, cell:Cell, other_cell:Cell) -> None:
+        # Merge sets when a connection is made, hanging the shallower tree
+        # under the deeper one (union by rank).
+        root = self.find(cell)
+        other_root = self.find(other_cell)
+        if root == other_root:
+            return
+        if self.rank[root] < self.rank[other_root]:
+            root, other_root = other_root, root
+        self.parent[other_root] = root
+        if self.rank[root] == self.rank[other_root]:
+            self.rank[root] += 1
+
+    def group_sets_by_id(self, row:list) -> dict:
         # Group cells by their set IDs.
         groups = {}
         for cell in row:
-            cell_set_id = sets[cell]
-            if cell_set_id not in groups:
-                groups[cell_set_id] = []
-            groups[cell_set_id].append(cell)
-        return groups
\ No newline at end of file
+            groups.setdefault(self.find(cell), []).append(cell)
+        return groups
@@ -1,4 +1,6 @@
 from a8 import Grid, Cell, BinaryTreeMazeMaker, SidewinderMazeMaker, DjikstraSolver, EllerMazeMaker
+import random
+import numpy as np
 import pytest
 
 # All for writing tests
@@ -7,9 +9,8 @@ class TestCell:
         cell = Cell(5, 6)
         assert cell.row == 5
         assert cell.col == 6
-        assert len(cell.neighbor_cells) == 0
+        assert cell.neighbors() == []
         assert len(cell.links) == 0
-        assert cell.content == " "
         assert cell.distance == 0
 
     def test_cell_link_bidirectional(self):
@@ -87,6 +88,27 @@ class TestCell:
 
         assert not cell1.is_linked(cell3)
 
+    def test_cell_link_mask(self):
+        cell = Cell(5, 6)
+        cell_north = Cell(4, 6)
+        cell_east = Cell(5, 7)
+        cell_far = Cell(2, 4)
+
+        cell.link(cell_north)
+        cell.link(cell_east)
+        cell.link(cell_far)
+
+        assert cell.link_mask == Cell.NORTH_BIT | Cell.EAST_BIT
+        assert cell_north.link_mask == Cell.SOUTH_BIT
+        assert cell_east.link_mask == Cell.WEST_BIT
+        assert cell_far.link_mask == 0
+        assert cell.is_linked_dir(Cell.NORTH_BIT)
+        assert not cell.is_linked_dir(Cell.SOUTH_BIT)
+
+        cell.unlink(cell_north)
+        assert cell.link_mask == Cell.EAST_BIT
+        assert cell_north.link_mask == 0
+
     def test_cell_set_get_neighbors(self):
         cell = Cell(5, 6)
         cell_north = Cell(4, 6)
@@ -99,6 +121,14 @@ class TestCell:
 
         with pytest.raises(NotImplementedError):
             assert cell.get_neighbor("foobar")
+        with pytest.raises(NotImplementedError):
+            assert cell.get_neighbor(7)
+        with pytest.raises(NotImplementedError):
+            assert cell.get_neighbor(-1)
+        with pytest.raises(NotImplementedError):
+            cell.set_neighbor(-1, cell_north)
+        with pytest.raises(NotImplementedError):
+            cell.set_neighbor("foobar", cell_north)
 
         assert cell.get_neighbor(Cell.SOUTH) is None
 
@@ -185,6 +215,21 @@ class TestCell:
         closest = cell.get_closest_cell()
         assert closest is cell_north
 
+    def test_cell_closest_neighbors_unlinked(self):
+        cell = Cell(5, 6)
+        cell_north = Cell(4, 6)
+        cell_east = Cell(5, 7)
+
+        cell.set_neighbor(Cell.NORTH, cell_north)
+        cell.set_neighbor(Cell.EAST, cell_east)
+        cell_north.distance = 1 ## Closer, but there's no passage to it
+        cell_east.distance = 2
+
+        assert cell.get_closest_cell() is None
+
+        cell.link(cell_east)
+        assert cell.get_closest_cell() is cell_east
+
     def test_cell_closest_neighbors_no_neighbors(self):
         cell = Cell(5, 6)
 
@@ -274,6 +319,173 @@ class TestGrid:
             assert cell.row < 3
             assert cell.col < 4
 
+        ## Changing the returned list leaves the grid alone
+        cells.reverse()
+        cells.append(Cell(9, 9))
+        assert len(grid.all_cells()) == 12
+        assert grid.all_cells()[grid.cell_id(1, 2)] is grid.get_cell(1, 2)
+
+    def test_grid_adjacency(self):
+        grid = Grid(3, 4)
+        grid.get_cell(0, 0).link(grid.get_cell(0, 1))
+        grid.get_cell(0, 1).link(grid.get_cell(1, 1))
+
+        offsets, neighbors = grid.adjacency()
+        assert len(offsets) == 13
+        assert grid.cell_id(1, 1) == 5
+        assert neighbors[offsets[0]:offsets[1]] == [1]
+        assert sorted(neighbors[offsets[1]:offsets[2]]) == [0, 5]
+        assert neighbors[offsets[5]:offsets[6]] == [1]
+        assert offsets[6] == offsets[12] == len(neighbors)
+
+
+    def test_grid_solve_maze_shortest(self):
+        grid = Grid(3, 3)
+        c00 = grid.get_cell(0, 0)
+        c01 = grid.get_cell(0, 1)
+        c02 = grid.get_cell(0, 2)
+        c10 = grid.get_cell(1, 0)
+        c12 = grid.get_cell(1, 2)
+        c20 = grid.get_cell(2, 0)
+        c21 = grid.get_cell(2, 1)
+        c22 = grid.get_cell(2, 2)
+        ## Two routes around the edge, and a shortcut through the middle
+        c00.link(c01)
+        c01.link(c02)
+        c02.link(c12)
+        c12.link(c22)
+        c00.link(c10)
+        c10.link(c20)
+        c20.link(c21)
+        c21.link(c22)
+        c11 = grid.get_cell(1, 1)
+        c01.link(c11)
+        c11.link(c21)
+
+        path = grid.solve_maze(c00, c22)
+        assert len(path) == 5
+        assert path[0] is c00
+        assert path[-1] is c22
+        for cell, next_cell in zip(path, path[1:]):
+            assert cell.is_linked(next_cell)
+
+        assert grid.solve_maze(c00, Cell(7, 7)) is None
+
+    def test_grid_solve_maze_perfect(self):
+        grid = Grid(8, 9)
+        maze = SidewinderMazeMaker(grid)
+        maze.make_maze()
+        assert grid.perfect
+
+        start = grid.get_cell(0, 0)
+        end = grid.get_cell(7, 8)
+        path = grid.solve_maze(start, end)
+        assert path[0] is start
+        assert path[-1] is end
+        for cell, next_cell in zip(path, path[1:]):
+            assert cell.is_linked(next_cell)
+        ## The only path, so it's also what the solver finds
+        assert path == DjikstraSolver(grid).solve()
+
+        ## Editing the maze means it might not be perfect any more
+        start.link(start.get_neighbor(Cell.SOUTH))
+        assert not grid.perfect
+
+    def test_grid_freeze(self):
+        grid = Grid(3, 4)
+        maze = SidewinderMazeMaker(grid)
+        maze.make_maze()
+        c00 = grid.get_cell(0, 0)
+        c01 = grid.get_cell(0, 1)
+        c10 = grid.get_cell(1, 0)
+        for cell in grid.all_cells():
+            assert type(cell.links) is tuple
+
+        ## Still editable after freezing
+        c00.unlink(c01)
+        c00.unlink(c10)
+        assert len(c00.links) == 0
+        c00.link(c01)
+        assert c00.is_linked(c01)
+        assert c01.is_linked(c00)
+
+    def test_grid_walls(self):
+        grid = Grid(2, 3)
+        c00 = grid.get_cell(0, 0)
+        c01 = grid.get_cell(0, 1)
+        c11 = grid.get_cell(1, 1)
+        c00.link(c01)
+        grid.freeze()
+
+        east, south = grid.walls()
+        assert east.shape == (2, 3)
+        assert not east[0, 0]
+        assert east[0, 1]
+        assert east[0, 2] ## Edge of the grid
+        assert south.all()
+        assert grid.walls() is grid.walls()
+        with pytest.raises(ValueError):
+            east[0, 0] = True
+
+        ## Editing some other grid leaves this one's walls alone
+        other = Grid(2, 2)
+        other.freeze()
+        other.get_cell(0, 0).link(other.get_cell(0, 1))
+        assert grid.walls() is grid.walls()
+
+        ## Rebuilt after the maze changes
+        c01.link(c11)
+        east, south = grid.walls()
+        assert not south[0, 1]
+        assert "|       |" in grid.print()
+
+    def test_grid_generate_batch(self):
+        grids = Grid.generate_batch(5, 7, 4, SidewinderMazeMaker, workers=2, seed=42)
+        assert len(grids) == 4
+        ## make_maze_masks reseeds the global generators, so put them back after
+        random_state = random.getstate()
+        np_random_state = np.random.get_state()
+        try:
+            expected = [Grid.make_maze_masks((5, 7, SidewinderMazeMaker, 42 + index)) for index in range(4)]
+        finally:
+            random.setstate(random_state)
+            np.random.set_state(np_random_state)
+        for grid, masks in zip(grids, expected):
+            assert grid.num_rows == 5
+            assert grid.num_cols == 7
+            assert grid.perfect
+            ## Matches the same maze made in this process
+            assert [cell.link_mask for cell in grid.all_cells()] == masks
+            for cell in grid.all_cells():
+                assert len(cell.links) > 0
+                for neighbor in cell.links:
+                    assert neighbor.is_linked(cell)
+
+        all_masks = Grid.generate_batch(5, 7, 4, SidewinderMazeMaker, workers=2, seed=42, as_grids=False)
+        assert all_masks == [grid.link_masks().ravel().tolist() for grid in grids]
+
+    def test_grid_link_from_masks(self):
+        grid = Grid(4, 5)
+        maze = EllerMazeMaker(grid)
+        maze.make_maze()
+
+        copy = Grid(4, 5)
+        copy.link_from_masks(grid.link_masks().ravel().tolist(), perfect=True)
+        for cell, cell_copy in zip(grid.all_cells(), copy.all_cells()):
+            assert cell_copy.link_mask == cell.link_mask
+            assert sorted((n.row, n.col) for n in cell_copy.links) == sorted((n.row, n.col) for n in cell.links)
+            for neighbor in cell_copy.links:
+                assert copy.get_cell(neighbor.row, neighbor.col) is neighbor
+        assert copy.frozen
+        assert copy.perfect
+        assert DjikstraSolver(copy).solve()[-1] is copy.get_cell(3, 4)
+
+        ## Not marked perfect unless asked
+        other = Grid(4, 5)
+        other.link_from_masks(grid.link_masks().ravel().tolist())
+        assert other.frozen
+        assert not other.perfect
+
 
 class TestBinaryTreeMazeMaker():
     def test_binary_tree_maze_maker(self):
@@ -282,13 +494,13 @@ class TestBinaryTreeMazeMaker():
         maze = BinaryTreeMazeMaker(grid)
         maze.make_maze()
         grid.print()
-        grid.export_image("./images/binary_tree_maze.png")
+        image = grid.export_image("./images/binary_tree_maze.png")
         solver = DjikstraSolver(grid)
         path = solver.solve()
         for ind, cell in enumerate(grid):
             cell.content = cell.distance
         grid.draw_export_image(
-            './images/binary_tree_maze.png', 
+            image, 
             path, 
             './images/binary_tree_maze_solved.png'
         )
@@ -336,13 +548,13 @@ class TestDjikstraSolver():
 
         for ind, cell in enumerate(grid):
             cell.content = str(ind)
-        grid.export_image("./images/maze_djik_basic.png")
+        image = grid.export_image("./images/maze_djik_basic.png")
         solver = DjikstraSolver(grid)
         path = solver.solve()
         for ind, cell in enumerate(grid):
             cell.content = cell.distance
         grid.draw_export_image(
-            './images/maze_djik_basic.png', 
+            image, 
             path, 
             './images/maze_djik_basic_solved.png'
         )
@@ -447,6 +659,33 @@ class TestDjikstraSolver():
         assert path[4] is c13
         assert path[5] is c23
 
+    def test_djikstra_distances_exact_along_path(self):
+        ## Every cell linked to all its neighbors: lots of loops and lots of
+        ## equally short paths, so A* stops with plenty of cells unfinished
+        grid = Grid(6, 7)
+        for cell in grid.all_cells():
+            for neighbor in cell.neighbors():
+                cell.link(neighbor)
+
+        solver = DjikstraSolver(grid)
+        path = solver.solve()
+        assert len(path) == 6 + 7 - 1
+        for index, cell in enumerate(path):
+            assert cell.distance == index
+        for cell, next_cell in zip(path, path[1:]):
+            assert cell.is_linked(next_cell)
+
+    def test_djikstra_large_maze(self):
+        ## Big enough to use the compiled search when numba is installed
+        grid = Grid(200, 200)
+        maze = SidewinderMazeMaker(grid)
+        maze.make_maze()
+
+        path = DjikstraSolver(grid).solve()
+        assert path == grid.solve_maze(grid.get_cell(0, 0), grid.get_cell(199, 199))
+        for index, cell in enumerate(path):
+            assert cell.distance == index
+
     def test_djikstra_no_solution(self):
         grid = Grid(10, 10)
         solver = DjikstraSolver(grid)
@@ -469,13 +708,13 @@ class TestDjikstraSolver():
         c13.link(c23)
         for ind, cell in enumerate(grid):
             cell.content = str(ind)
-        grid.export_image("./images/maze_djik.png")
+        image = grid.export_image("./images/maze_djik.png")
         solver = DjikstraSolver(grid)
         path = solver.solve()
         for ind, cell in enumerate(grid):
             cell.content = cell.distance
         grid.draw_export_image(
-            './images/maze_djik.png', 
+            image, 
             path, 
             './images/maze_djik_solved.png'
         )
@@ -494,12 +733,12 @@ class TestDjikstraSolver():
         maze = BinaryTreeMazeMaker(grid)
         maze.make_maze()
         grid.print()
-        grid.export_image("./images/maze_basic.png")
+        image = grid.export_image("./images/maze_basic.png")
         solver = DjikstraSolver(grid)
         path = solver.solve()
         for ind, cell in enumerate(grid):
             cell.content = cell.distance
-        grid.draw_export_image('./images/maze_basic.png', path, './images/maze_basic_solved.png')
+        grid.draw_export_image(image, path, './images/maze_basic_solved.png')
 
 
 class TestOther:
@@ -537,18 +776,39 @@ class TestSidewinder:
         maze.make_maze()
         for ind, cell in enumerate(grid):
             cell.content = ind
-        grid.export_image("./images/maze_sidewinder.png")
+        image = grid.export_image("./images/maze_sidewinder.png")
         solver = DjikstraSolver(grid)
         path = solver.solve()
         for ind, cell in enumerate(grid):
             cell.content = cell.distance
         grid.draw_export_image(
-            './images/maze_sidewinder.png', 
+            image, 
             path, 
             './images/maze_sidewinder_solved.png'
         )
 
 class TestEllerMazeMaker:
+    def test_maze_ellermaze_is_perfect(self):
+        ## A perfect maze: one fewer passage than cells, and every cell
+        ## can be reached from the north-west corner
+        for num_rows, num_cols in [(1, 1), (1, 7), (7, 1), (6, 6), (9, 13)]:
+            grid = Grid(num_rows, num_cols)
+            maze = EllerMazeMaker(grid)
+            maze.make_maze()
+
+            passages = sum(len(cell.links) for cell in grid.all_cells()) // 2
+            assert passages == num_rows * num_cols - 1
+
+            start = grid.get_cell(0, 0)
+            reached = {start}
+            stack = [start]
+            while stack:
+                for neighbor in stack.pop().links:
+                    if neighbor not in reached:
+                        reached.add(neighbor)
+                        stack.append(neighbor)
+            assert len(reached) == num_rows * num_cols
+
     def test_maze_ellermaze(self):
         grid = Grid(6, 6)
         maze = EllerMazeMaker(grid)
@@ -567,13 +827,13 @@ class TestEllerMazeMaker:
         maze.make_maze()
         for ind, cell in enumerate(grid):
             cell.content = ind
-        grid.export_image("./images/maze_ellermaze.png")
+        image = grid.export_image("./images/maze_ellermaze.png")
         solver = DjikstraSolver(grid)
         path = solver.solve()
         for ind, cell in enumerate(grid):
             cell.content = cell.distance
         grid.draw_export_image(
-            './images/maze_ellermaze.png', 
+            image, 
             path, 
             './images/maze_ellermaze_solved.png'
         )